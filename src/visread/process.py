@@ -1,7 +1,12 @@
+import string
+
 import numpy as np
 from astropy.constants import c
 
-def weight_to_sigma(weight):
+# multiply a baseline in [m] by a frequency in [Hz] and this factor to get the baseline in [klambda]
+_INV_C_KLAMBDA = 1e-3 / c.value
+
+def weight_to_sigma(weight, dtype=None):
     r"""
     Convert a weight (:math:`w`) to an uncertainty (:math:`\sigma`) using
 
@@ -11,35 +16,45 @@ def weight_to_sigma(weight):
 
     Args:
         weight (float or np.array): statistical weight value
+        dtype (np.dtype): the precision of the calculation. Defaults to ``None``, which keeps the precision of ``weight``.
 
     Returns:
         sigma (float or np.array): the corresponding uncertainty
     """
+    weight = np.asarray(weight, dtype=dtype)
 
-    return np.sqrt(1 / weight)
+    return 1.0 / np.sqrt(weight)
 
 
-def broadcast_weights(weight, data_shape, chan_axis=0):
+def broadcast_weights(weight, nchan, dtype=None, scale=1.0):
     r"""
     Broadcast a vector of non-channelized weights to match the shape of the visibility data that is channelized (e.g., for spectral line applications) but already averaged over polarizations.
 
+    .. note::
+
+        ``broadcast_weights`` previously took the shape of the data and a ``chan_axis`` argument. It now takes the number of channels directly, e.g., ``broadcast_weights(weight, data.shape[0])``.
+
     Args:
-        weight (np.array): the weights
-        data_shape (tuple): the shape of the data
-        chan_axis (int): the axis which represents the number of channels in the data array, typically 0 for visibility data that has already been averaged over polarizations.
+        weight (np.array): the weights, shape ``(nvis,)``
+        nchan (int): the number of channels in the data
+        dtype (np.dtype): the precision of the returned weights. Defaults to ``None``, which keeps the precision of ``weight``.
+        scale (float): a common factor to multiply all weights by, applied before they are broadcast so that it only touches ``nvis`` values. E.g., ``scale=1 / sigma_rescale**2`` is equivalent to calling ``rescale_weights`` on the broadcasted weights.
 
     Returns:
-        np.array (float) array of weights the same shape as the data
+        np.array (float) array of weights with shape ``(nchan, nvis)``. This is a read-only view onto ``weight`` (or its cast to ``dtype``, or its rescaled copy), so no memory is allocated for the repeated channels; use ``np.ascontiguousarray`` on the result if a writeable copy is needed.
     """
+    weight = np.asarray(weight, dtype=dtype)
 
+    if scale != 1.0:
+        # multiply at the precision of the weights, so that a float64 ``scale`` (e.g., a NumPy
+        # scalar) doesn't promote single precision weights
+        out_dtype = weight.dtype if np.issubdtype(weight.dtype, np.inexact) else None
+        weight = np.multiply(weight, scale, dtype=out_dtype)
 
-    nchan = data_shape[chan_axis]
-
-    broadcast = np.ones((nchan, 1))
-    return weight[np.newaxis, :] * broadcast
+    return np.broadcast_to(weight[np.newaxis, :], (nchan, weight.shape[0]))
 
 
-def rescale_weights(weight, sigma_rescale):
+def rescale_weights(weight, sigma_rescale, dtype=None):
     r"""
     Rescale all weights by a common factor. It would be as if :math:`\sigma` were rescaled by this factor.
     
@@ -50,40 +65,55 @@ def rescale_weights(weight, sigma_rescale):
     Args:
         weight (float or np.array): the weights
         sigma_rescale (float): the factor by which to rescale the weight 
+        dtype (np.dtype): the precision of the rescaled weights. Defaults to ``None``, which keeps the precision of ``weight``.
 
     Returns:
         (float or np.array) the rescaled weights
     """
+    weight = np.asarray(weight, dtype=dtype)
+
     return weight / (sigma_rescale**2)
 
 
-def average_weight_polarization(weight, polarization_axis=0):
+def average_weight_polarization(weight, polarization_axis=0, out=None):
     """
     Average the weights over the polarization axis.
 
     Args:
         weight (np.array): weight array. Could be shape `(2, nchan, nvis)` or just `(2, nvis)`, dependending on whether it has been broadcasted already. 
         polarization_axis (int): the polarization axis, typically 0.
+        out (np.array): optional preallocated array, with the shape and dtype of the result, into which the summed weights are written.
 
     Returns:
         (np.array): weight array summed over the polarization axis. Could be shape `(nchan, nvis)` or just `(nvis)` depending on whether it was broadcasted across channels.
     """
 
-    return np.sum(weight, axis=polarization_axis)
+    if weight.shape[polarization_axis] == 2:
+        # dual-polarization fast path, a single elementwise add of two views
+        weight_0, weight_1 = np.moveaxis(weight, polarization_axis, 0)
+        return np.add(weight_0, weight_1, out=out)
+
+    return np.sum(weight, axis=polarization_axis, out=out)
 
-def average_flag_polarization(flag, polarization_axis=0):
+def average_flag_polarization(flag, polarization_axis=0, out=None):
     """
     Collapse the flags across the polarization axis, taking the approach that if either polarization is flagged, the averaged product shoud be flagged too.
 
     Args:
         flag (np.array bool): flag array. Could be multidimensional, e.g. `(2, nchan, nvis)` or just `(2, nvis)`.
         polarization_axis (int): the polarization axis, typically 0.
+        out (np.array bool): optional preallocated array, with the shape of the result, into which the collapsed flags are written.
 
     Returns:
         (np.array bool): flag array collapsed across the polarization axis. Could be shape `(nchan, nvis)` or just `(nvis)` depending on whether it was broadcasted across channels.
 
     """
-    return np.any(flag, axis=polarization_axis)
+    if flag.shape[polarization_axis] == 2:
+        # dual-polarization fast path, a single elementwise OR of two views
+        flag_0, flag_1 = np.moveaxis(flag, polarization_axis, 0)
+        return np.logical_or(flag_0, flag_1, out=out)
+
+    return np.any(flag, axis=polarization_axis, out=out)
 
 
 def convert_baselines(baselines, freq):
@@ -97,14 +127,30 @@ def convert_baselines(baselines, freq):
     Returns:
         (1D array nvis): baselines in [klambda]
     """
-    # calculate wavelengths in meters
-    wavelengths = c.value / freq  # m
+    # multiplying by freq / c is the same as dividing by the wavelength in meters
+    return baselines * (freq * _INV_C_KLAMBDA)  # [klambda]
+
+
+def broadcast_baselines_soa(uv, chan_freq, out=None):
+    r"""
+    Convert baselines to kilolambda and broadcast to match shape of channel frequencies, keeping :math:`u` and :math:`v` together in a single array.
+
+    Args:
+        uv (2, nvis): :math:`u` and :math:`v` baselines [m], e.g., the first two rows of a ``uvw`` array
+        chan_freq (1D array nchan): frequencies [Hz]
+        out (2, nchan, nvis): optional preallocated float array into which the converted baselines are written.
+
+    Returns:
+        (2, nchan, nvis) array of the :math:`u` and :math:`v` baselines in [klambda]
+    """
+    # inverse wavelength, converting [m] to [klambda], shape (nchan, 1)
+    inv_wavelength = chan_freq[:, np.newaxis] * _INV_C_KLAMBDA
 
-    # calculate baselines in klambda
-    return 1e-3 * baselines / wavelengths  # [klambda]
+    # a single multiply writes u and v for all channels in one pass
+    return np.multiply(uv[:, np.newaxis, :], inv_wavelength, out=out)  # [klambda]
 
 
-def broadcast_and_convert_baselines(u, v, chan_freq):
+def broadcast_and_convert_baselines(u, v, chan_freq, out=None):
     r"""
     Convert baselines to kilolambda and broadcast to match shape of channel frequencies.
 
@@ -112,30 +158,35 @@ def broadcast_and_convert_baselines(u, v, chan_freq):
         u (1D array nvis): baseline [m]
         v (1D array nvis): baseline [m]
         chan_freq (1D array nchan): frequencies [Hz]
+        out (2, nchan, nvis): optional preallocated float array into which the converted baselines are written.
 
     Returns:
-        (u, v) each of which are (nchan, nvis) arrays of baselines in [klambda]
+        (u, v) each of which are (nchan, nvis) arrays of baselines in [klambda]. These are views into a single ``(2, nchan, nvis)`` array, see :func:`broadcast_baselines_soa`.
     """
+    uv = broadcast_baselines_soa(np.stack((u, v)), chan_freq, out=out)
 
-    nchan = len(chan_freq)
-
-    # broadcast to the same shape as the data
-    # stub to broadcast u, v to all channels
-    broadcast = np.ones((nchan, 1))
-    uu = u * broadcast
-    vv = v * broadcast
+    return (uv[0], uv[1])
 
-    # calculate wavelengths in meters
-    wavelengths = c.value / chan_freq[:, np.newaxis]  # m
 
-    # calculate baselines in klambda
-    uu = 1e-3 * uu / wavelengths  # [klambda]
-    vv = 1e-3 * vv / wavelengths  # [klambda]
+def _polarization_average_subscripts(data_ndim, weight_ndim, polarization_axis):
+    """
+    Build the ``np.einsum`` subscripts that sum ``data * weight`` over the polarization axis. Returns ``None`` if the combination of array dimensions and polarization axis is not supported.
+    """
+    data_axes = string.ascii_lowercase[:data_ndim]
+    out_axes = data_axes.replace(data_axes[polarization_axis], "")
+
+    if data_ndim == weight_ndim:
+        weight_axes = data_axes
+    elif (data_ndim == 3) and (weight_ndim == 2) and (polarization_axis == 0):
+        # channelized data (npol, nchan, nvis) with non-channelized weights (npol, nvis)
+        weight_axes = data_axes[0] + data_axes[2]
+    else:
+        return None
 
-    return (uu, vv)
+    return "{:},{:}->{:}".format(data_axes, weight_axes, out_axes)
 
 
-def average_data_polarization(data, weight, polarization_axis=0):
+def average_data_polarization(data, weight, polarization_axis=0, out=None):
     """
     Perform a weighted average of the data over the polarization axis.
 
@@ -143,11 +194,13 @@ def average_data_polarization(data, weight, polarization_axis=0):
         data (npol, nchan, nvis): complex data array. Could either be real data or model_data.
         weight (npol, nvis): weight array matching data array
         polarization_axis (int): index of the polarization axis, typically 0.
+        out (nchan, nvis): optional preallocated array, with the shape of the result and the dtype ``np.result_type(data, weight)``, into which the average is written. Must be a float or complex array.
 
     Returns:
         data averaged over the polarization axis.
     """
-    assert data.shape[polarization_axis] == 2, "Not recognized as a dual-polarization dataset"
+    if data.shape[polarization_axis] != 2:
+        raise ValueError("Not recognized as a dual-polarization dataset, data has shape {:}".format(data.shape))
 
     # we need to check whether weight is the same shape as the data, because sometimes the data is 
     # channelized and the weights are not
@@ -157,12 +210,22 @@ def average_data_polarization(data, weight, polarization_axis=0):
     # normalization after averaging over the polarization axis
     norm = average_weight_polarization(weight, polarization_axis=polarization_axis)
 
-    if len(data.shape) == len(weight.shape):
-        return np.sum(data * weight, axis=polarization_axis) / norm
-    elif (len(data.shape) == 3) and (len(weight.shape) == 2):
-        return np.sum(data * weight[:,np.newaxis,:], axis=polarization_axis) / norm
-    else:
-        raise RuntimeError("I don't know what to do with provided data and weight arrays with shapes {:} and {:}, respectively".format(data.shape, weight.shape))
+    subscripts = _polarization_average_subscripts(data.ndim, weight.ndim, polarization_axis)
+    if subscripts is None:
+        raise ValueError("I don't know what to do with provided data and weight arrays with shapes {:} and {:}, respectively".format(data.shape, weight.shape))
+
+    # einsum streams the weighted sum over polarizations without materializing data * weight
+    # (np.average would form that full-size product internally), and broadcasts
+    # non-channelized weights across channels directly from the subscripts
+    avg = np.einsum(subscripts, data, weight, out=out)
+
+    if np.issubdtype(avg.dtype, np.inexact):
+        # normalize in place, rather than allocating a second output array
+        avg /= norm
+        return avg
+
+    # integer inputs can't hold the (float) average in place
+    return avg / norm
 
 def contains_autocorrelations(ant1, ant2):
     """
@@ -175,15 +238,20 @@ def contains_autocorrelations(ant1, ant2):
     Returns:
         boolean: True if list contains autocorrelation pairs.
     """
-    autocorrelation_mask = (ant1 == ant2)
-    return np.sum(autocorrelation_mask) > 0 
+    return bool(np.any(ant1 == ant2))
 
-def get_crosscorrelation_indexes(ant1, ant2):
+def get_crosscorrelation_mask(ant1, ant2):
+    """
+    Get a mask selecting the cross-correlations (visibilities between two different antennas).
 
-    # index to cross-correlations
-    xc = np.where(ant1 != ant2)[0]
+    Args:
+        ant1 (np.array int): antenna 1
+        ant2 (np.array int): antenna 2
 
-    return xc
+    Returns:
+        np.array bool: True for each cross-correlation, False for each autocorrelation.
+    """
+    return ant1 != ant2
 
 def isdecreasing(chan_freq):
     '''
@@ -197,39 +265,44 @@ def isdecreasing(chan_freq):
     '''
     # check to make sure we're in blushifted - redshifted order, otherwise reverse channel order
     nchan = len(chan_freq)
-    if nchan == 1:
+    if nchan <= 1:
         return True
 
-    diff = np.diff(chan_freq)
-
-    if np.all(diff < 0):
+    # compare offset views rather than allocating np.diff, and use the first
+    # pair of channels to decide which single ordering test needs to run
+    if (chan_freq[1] < chan_freq[0]) and np.all(chan_freq[1:] < chan_freq[:-1]):
         return True # strictly decreasing
-    elif np.all(diff > 0):
+    elif (chan_freq[1] > chan_freq[0]) and np.all(chan_freq[1:] > chan_freq[:-1]):
         return False # strictly increasing
     else:
         raise RuntimeError("chan_freq array is neither strictly decreasing nor strictly increasing, investigate what went wrong.")
         
-def reverse_array(array, channel_axis=1):
+def reverse_array(array, channel_axis=1, copy=False):
     """
     If the channel frequencies are stored in an order different than the one we desire, we can reverse the axes.
 
     Args:
         array (np.array): the input array, could be chan_freq, data, flag, etc.
         channel_axis (int): which axis is the channel axis?
+        copy (bool): if ``False``, return a (non-contiguous) reversed view of ``array``. If ``True``, return a contiguous reversed copy, which is faster to read if the array will be accessed several times afterwards.
     
     Returns:
         np.array sorted
     """
+    if copy:
+        return np.ascontiguousarray(np.flip(array, axis=channel_axis))
+
     return np.flip(array, axis=channel_axis)
 
 
-def get_channel_sorted_data(filename, datadescid):
+def get_channel_sorted_data(filename, datadescid, query=None, dtype=np.complex64):
     # get the channels
     chan_freq = get_channels(filename, datadescid)
     nchan = len(chan_freq)
 
-    # get the data and flags
-    query = query_datadescid(filename, datadescid)
+    # get the data and flags, reusing the caller's query if one was provided
+    if query is None:
+        query = query_datadescid(filename, datadescid)
     data = query["data"]
     model_data = query["model_data"]
     flag = query["flag"]
@@ -237,16 +310,69 @@ def get_channel_sorted_data(filename, datadescid):
     # check to make sure we're in blushifted - redshifted order, otherwise reverse channel order
     if (nchan > 1) and (chan_freq[1] > chan_freq[0]):
         # reverse channels
-        chan_freq = chan_freq[::-1]
-        data = data[:, ::-1, :]
-        model_data = model_data[:, ::-1, :]
-        flag = flag[:, ::-1, :]
+        # data and model_data are read several times, so they are materialized contiguously by
+        # the cast below, while flag is only read once (when selecting the cross-correlations)
+        # so it stays a view
+        chan_freq = reverse_array(chan_freq, channel_axis=0, copy=True)
+        data = reverse_array(data)
+        model_data = reverse_array(model_data)
+        flag = reverse_array(flag)
+
+    # cast the visibilities to ``dtype`` (by default single precision, as they are stored in the
+    # measurement set), which also materializes any reversed channels as a contiguous copy
+    data = np.ascontiguousarray(data, dtype=dtype)
+    model_data = np.ascontiguousarray(model_data, dtype=dtype)
 
     return chan_freq, data, model_data, flag
 
 
+def _check_buffer(out, key, shape, dtype):
+    """
+    Raise a ValueError if the preallocated ``buffers[key]`` array ``out`` doesn't have the ``shape`` and ``dtype`` it will be written with.
+    """
+    if (out.shape != shape) or (out.dtype != dtype):
+        raise ValueError(
+            "buffers[{!r}] has shape {:} and dtype {:}, ".format(key, out.shape, out.dtype)
+            + "but shape {:} and dtype {:} are required".format(shape, np.dtype(dtype))
+        )
+
+
+def _get_buffer(buffers, key, shape, dtype):
+    """
+    Get the preallocated ``buffers[key]`` array, checking its ``shape`` and ``dtype``, or ``None`` if it wasn't provided.
+    """
+    out = None if buffers is None else buffers.get(key)
+    if out is not None:
+        _check_buffer(out, key, shape, dtype)
+
+    return out
+
+
+def _take_crosscorrelations(array, xc, buffers=None, key=None, xc_indexes=None):
+    """
+    Select the cross-correlation visibilities (the last axis) of ``array`` using the boolean mask ``xc``, writing into ``buffers[key]`` if such a preallocated array was provided. ``xc_indexes`` may hold ``np.flatnonzero(xc)``, so that callers selecting several arrays into buffers only resolve the mask once.
+    """
+    out = None if buffers is None else buffers.get(key)
+    if out is None:
+        return np.compress(xc, array, axis=-1)
+
+    # np.compress(..., out=out) writes through a temporary, so resolve the mask to indexes instead
+    # these are always in bounds, and ``mode="clip"`` lets np.take write straight into ``out``
+    if xc_indexes is None:
+        xc_indexes = np.flatnonzero(xc)
+
+    _check_buffer(out, key, array.shape[:-1] + xc_indexes.shape, array.dtype)
+
+    return np.take(array, xc_indexes, axis=-1, out=out, mode="clip")
+
+
 def get_processed_visibilities(
-    filename, datadescid, sigma_rescale=1.0, model_data=False
+    filename,
+    datadescid,
+    sigma_rescale=1.0,
+    model_data=False,
+    buffers=None,
+    dtype=np.complex64,
 ):
     r"""
     Get all of the visibilities from a specific datadescid. Average polarizations.
@@ -254,52 +380,77 @@ def get_processed_visibilities(
     Args:
         filename (str): path to measurementset to process
         datadescid (int): a specific datadescid to process
-        sigma_rescale (float): by what factor should the sigmas be rescaled (applied to weights via ``rescale_weights``)
+        sigma_rescale (float): by what factor should the sigmas be rescaled (applied to weights via the ``scale`` argument of ``broadcast_weights``)
         model_data (bool): include the model_data column?
+        buffers (dict): optional preallocated arrays, so that repeated calls (e.g., in a loop over datadescids with the same shape) can reuse memory rather than allocating new arrays each time. Recognized keys are "uvw" `(3, nxc)`, "weight" `(npol, nxc)`, "data", "model_data", and "flag" `(npol, nchan, nxc)` for the selected cross-correlations, "uv" `(2, nchan, nxc)` for the baselines, and "data_avg", "model_data_avg", "flag_avg" `(nchan, nxc)` and "weight_avg" `(nxc,)` for the polarization-averaged outputs, where `nxc` is the number of cross-correlation visibilities. Any key may be omitted. Each buffer must match the dtype of the array it receives. When all keys are provided, the only arrays still allocated on each call are the small per-row ones (e.g., the ``(nxc,)`` normalization of the weighted averages). Note that returned arrays may be views of these buffers, and will be overwritten by the next call that reuses them.
+        dtype (np.dtype): the complex precision of the returned visibilities, with the weights cast to the matching real precision. Defaults to single precision (``np.complex64``), the precision at which visibilities are stored in the measurement set. Set to ``None`` to keep the precision returned by the query.
 
     Returns:
-        dictionary with keys "frequencies", "uu", "data", "flag", "weight"
+        dictionary with keys "frequencies", "uu", "data", "flag", "weight". The visibilities and weights have the precision set by ``dtype``. The weights are a read-only view broadcast across channels (see ``broadcast_weights``).
 
 
     """
-    # get sorted channels, data, and flags
-    chan_freq, data, model_data, flag = get_channel_sorted_data(filename, datadescid)
-    nchan = len(chan_freq)
-
-    # get baselines, weights, and antennas
+    # read the table once and share the result for data, flags, baselines, weights, and antennas
     query = query_datadescid(filename, datadescid)
 
-    # broadcast baselines
-    uu, vv, ww = query["uvw"]  # [m]
-    uu, vv = broadcast_baselines(uu, vv, chan_freq)
-
-    # broadcast and rescale weights
-    weight = query["weight"]
-    weight = broadcast_weights(weight, nchan)
-    weight = rescale_weights(weight, sigma_rescale)
-
-    # average polarizations
-    data, flag, weight, model_data = average_polarizations(
-        data, flag, weight, model_data
+    # get sorted channels, data, and flags
+    chan_freq, data, model_data, flag = get_channel_sorted_data(
+        filename, datadescid, query=query, dtype=dtype
     )
+    nchan = len(chan_freq)
 
     # calculate the cross correlation mask
     ant1 = query["antenna1"]
     ant2 = query["antenna2"]
     xc = get_crosscorrelation_mask(ant1, ant2)
 
-    # apply the xc mask across channels
-    # drop autocorrelation channels
-    uu = uu[:, xc]
-    vv = vv[:, xc]
-    data = data[:, xc]
-    model_data = model_data[:, xc]
-    flag = flag[:, xc]
-    weight = weight[:, xc]
+    # cast the weights once, to the real precision matching the visibilities
+    weight_dtype = None if dtype is None else np.finfo(dtype).dtype
+    weight = np.asarray(query["weight"], dtype=weight_dtype)
+
+    # drop autocorrelations up front, with one pass along the visibility axis per array
+    # the per-row quantities (uvw, weight) are selected before they are broadcast across
+    # channels, so only the channelized arrays pay for a full (nchan, nvis) selection
+    # writing into caller buffers needs integer indexes, so resolve the mask once for all arrays
+    xc_indexes = None if buffers is None else np.flatnonzero(xc)
+    uvw = _take_crosscorrelations(query["uvw"], xc, buffers, "uvw", xc_indexes)
+    weight = _take_crosscorrelations(weight, xc, buffers, "weight", xc_indexes)
+    data = _take_crosscorrelations(data, xc, buffers, "data", xc_indexes)
+    model_data = _take_crosscorrelations(
+        model_data, xc, buffers, "model_data", xc_indexes
+    )
+    flag = _take_crosscorrelations(flag, xc, buffers, "flag", xc_indexes)
+
+    # broadcast baselines
+    # the first two rows of uvw are already u and v stacked together
+    nxc = uvw.shape[-1]
+    out = _get_buffer(buffers, "uv", (2, nchan, nxc), np.result_type(uvw, chan_freq))
+    uu, vv = broadcast_baselines_soa(uvw[:2], chan_freq, out=out)  # [klambda]
+
+    # average polarizations
+    # each channelized array is read once: the data averages stream the non-channelized
+    # (npol, nvis) weights across channels inside einsum, and the flags are collapsed in one pass
+    data_dtype = np.result_type(data, weight)
+    out = _get_buffer(buffers, "data_avg", (nchan, nxc), data_dtype)
+    data = average_data_polarization(data, weight, out=out)
+    out = _get_buffer(buffers, "model_data_avg", (nchan, nxc), data_dtype)
+    model_data = average_data_polarization(model_data, weight, out=out)
+    out = _get_buffer(buffers, "flag_avg", (nchan, nxc), flag.dtype)
+    flag = average_flag_polarization(flag, out=out)
+
+    # the weighted averages don't depend on sigma_rescale, so the weights are only averaged,
+    # rescaled (in place, at their own precision), and broadcast across channels (as a view)
+    # once the data are done with them
+    out = _get_buffer(buffers, "weight_avg", (nxc,), weight.dtype)
+    weight = average_weight_polarization(weight, out=out)
+    if sigma_rescale != 1.0:
+        np.multiply(weight, 1.0 / sigma_rescale**2, out=weight)
+    weight = broadcast_weights(weight, nchan)
 
     # take the complex conjugate
-    data = np.conj(data)
-    model_data = np.conj(model_data)
+    # in place, since the averaged arrays are freshly allocated (or caller-owned) and writeable
+    np.conjugate(data, out=data)
+    np.conjugate(model_data, out=model_data)
 
     return {
         "frequencies": chan_freq,
@@ -0,0 +1,403 @@
+import numpy as np
+import pytest
+from astropy.constants import c
+
+from visread import process
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(42)
+
+
+def test_broadcast_weights(rng):
+    weight = rng.random(7)
+    broadcast = process.broadcast_weights(weight, 4)
+
+    assert broadcast.shape == (4, 7)
+    assert broadcast.dtype == np.float64
+    assert np.all(broadcast == weight[np.newaxis, :])
+
+    # zero-copy view, so it shouldn't be writeable
+    assert not broadcast.flags.writeable
+    assert np.shares_memory(broadcast, weight)
+
+
+def test_broadcast_weights_dtype(rng):
+    weight = rng.random(7)
+    broadcast = process.broadcast_weights(weight, 4, dtype=np.float32)
+
+    assert broadcast.dtype == np.float32
+    assert np.allclose(broadcast, weight[np.newaxis, :])
+
+
+def test_broadcast_weights_scale_dtype(rng):
+    weight = rng.random(7).astype(np.float32)
+
+    broadcast = process.broadcast_weights(weight, 4, scale=1.0 / np.float64(2.0) ** 2)
+
+    assert broadcast.dtype == np.float32
+    assert np.allclose(broadcast, weight[np.newaxis, :] / 4)
+
+
+def test_broadcast_weights_scale(rng):
+    weight = rng.random(7)
+    sigma_rescale = 2.0
+
+    broadcast = process.broadcast_weights(weight, 4, scale=1.0 / sigma_rescale ** 2)
+    expected = process.rescale_weights(
+        process.broadcast_weights(weight, 4), sigma_rescale
+    )
+
+    assert np.allclose(broadcast, expected)
+    # the input weights should be untouched
+    assert np.allclose(process.broadcast_weights(weight, 4), weight[np.newaxis, :])
+
+
+@pytest.mark.parametrize("npol", [1, 2, 4])
+@pytest.mark.parametrize("polarization_axis", [0, 1, 2])
+def test_average_weight_polarization(rng, npol, polarization_axis):
+    shape = [3, 7]
+    shape.insert(polarization_axis, npol)
+    weight = rng.random(shape)
+
+    avg = process.average_weight_polarization(weight, polarization_axis=polarization_axis)
+
+    assert np.allclose(avg, np.sum(weight, axis=polarization_axis))
+
+    out = np.empty((3, 7))
+    assert (
+        process.average_weight_polarization(
+            weight, polarization_axis=polarization_axis, out=out
+        )
+        is out
+    )
+    assert np.allclose(out, avg)
+
+
+@pytest.mark.parametrize("npol", [1, 2, 4])
+@pytest.mark.parametrize("polarization_axis", [0, 1, 2])
+def test_average_flag_polarization(rng, npol, polarization_axis):
+    shape = [3, 7]
+    shape.insert(polarization_axis, npol)
+    flag = rng.random(shape) > 0.7
+
+    avg = process.average_flag_polarization(flag, polarization_axis=polarization_axis)
+
+    assert avg.dtype == bool
+    assert np.all(avg == np.any(flag, axis=polarization_axis))
+
+    out = np.empty((3, 7), dtype=bool)
+    assert (
+        process.average_flag_polarization(flag, polarization_axis=polarization_axis, out=out)
+        is out
+    )
+    assert np.all(out == avg)
+
+
+def test_average_data_polarization_2D_weight(rng):
+    data = rng.normal(size=(2, 3, 7)) + 1.0j * rng.normal(size=(2, 3, 7))
+    weight = rng.random((2, 7))
+
+    avg = process.average_data_polarization(data, weight)
+    expected = np.sum(data * weight[:, np.newaxis, :], axis=0) / np.sum(weight, axis=0)
+
+    assert avg.shape == (3, 7)
+    assert np.allclose(avg, expected)
+
+
+def test_average_data_polarization_3D_weight(rng):
+    data = rng.normal(size=(2, 3, 7)) + 1.0j * rng.normal(size=(2, 3, 7))
+    weight = rng.random((2, 3, 7))
+
+    avg = process.average_data_polarization(data, weight)
+    expected = np.sum(data * weight, axis=0) / np.sum(weight, axis=0)
+
+    assert avg.shape == (3, 7)
+    assert np.allclose(avg, expected)
+
+
+def test_average_data_polarization_axis(rng):
+    data = rng.normal(size=(3, 7, 2)) + 1.0j * rng.normal(size=(3, 7, 2))
+    weight = rng.random((3, 7, 2))
+
+    avg = process.average_data_polarization(data, weight, polarization_axis=2)
+    expected = np.sum(data * weight, axis=2) / np.sum(weight, axis=2)
+
+    assert np.allclose(avg, expected)
+
+
+def test_average_data_polarization_integer():
+    data = np.array([[1, 2, 3], [2, 4, 7]])
+    weight = np.array([[1, 1, 3], [1, 3, 1]])
+
+    avg = process.average_data_polarization(data, weight)
+
+    assert np.issubdtype(avg.dtype, np.floating)
+    assert np.allclose(avg, np.sum(data * weight, axis=0) / np.sum(weight, axis=0))
+
+
+def test_average_data_polarization_bad_shapes(rng):
+    data = rng.normal(size=(2, 3, 7)) + 0.0j
+
+    with pytest.raises(ValueError):
+        # not dual-polarization
+        process.average_data_polarization(data[:1], rng.random((1, 7)))
+
+    with pytest.raises(ValueError):
+        # non-channelized weights with the polarization on another axis
+        process.average_data_polarization(
+            data[:, :2], rng.random((2, 7)), polarization_axis=1
+        )
+
+
+def test_broadcast_and_convert_baselines(rng):
+    u = rng.normal(size=7) * 1e3  # [m]
+    v = rng.normal(size=7) * 1e3  # [m]
+    chan_freq = np.linspace(230.1e9, 230.0e9, num=3)  # [Hz]
+
+    uu, vv = process.broadcast_and_convert_baselines(u, v, chan_freq)
+
+    wavelengths = c.value / chan_freq[:, np.newaxis]
+    assert uu.shape == (3, 7)
+    assert vv.shape == (3, 7)
+    assert np.allclose(uu, 1e-3 * u / wavelengths)
+    assert np.allclose(vv, 1e-3 * v / wavelengths)
+
+
+def test_broadcast_baselines_soa(rng):
+    uv = rng.normal(size=(2, 7)) * 1e3  # [m]
+    chan_freq = np.linspace(230.1e9, 230.0e9, num=3)  # [Hz]
+
+    uv_klambda = process.broadcast_baselines_soa(uv, chan_freq)
+
+    wavelengths = c.value / chan_freq[:, np.newaxis]
+    assert uv_klambda.shape == (2, 3, 7)
+    assert np.allclose(uv_klambda[0], 1e-3 * uv[0] / wavelengths)
+    assert np.allclose(uv_klambda[1], 1e-3 * uv[1] / wavelengths)
+
+    out = np.empty((2, 3, 7))
+    assert process.broadcast_baselines_soa(uv, chan_freq, out=out) is out
+    assert np.allclose(out, uv_klambda)
+
+
+def test_convert_baselines(rng):
+    baselines = rng.normal(size=7) * 1e3  # [m]
+    freq = 230.0e9  # [Hz]
+
+    assert np.allclose(
+        process.convert_baselines(baselines, freq),
+        1e-3 * baselines / (c.value / freq),
+    )
+
+
+def test_isdecreasing():
+    assert process.isdecreasing(np.array([230.2e9, 230.1e9, 230.0e9]))
+    assert not process.isdecreasing(np.array([230.0e9, 230.1e9, 230.2e9]))
+
+    # a single channel (or none) is trivially in the preferred order
+    assert process.isdecreasing(np.array([230.0e9]))
+    assert process.isdecreasing(np.array([]))
+
+
+@pytest.mark.parametrize(
+    "chan_freq",
+    [
+        [230.0e9, 230.1e9, 230.0e9],
+        [230.1e9, 230.0e9, 230.1e9],
+        [230.0e9, 230.0e9, 230.1e9],
+        [230.0e9, 230.0e9],
+    ],
+)
+def test_isdecreasing_non_monotonic(chan_freq):
+    with pytest.raises(RuntimeError):
+        process.isdecreasing(np.array(chan_freq))
+
+
+def test_reverse_array(rng):
+    array = rng.normal(size=(2, 4, 7))
+
+    reversed_view = process.reverse_array(array)
+    assert np.all(reversed_view == array[:, ::-1, :])
+    assert np.shares_memory(reversed_view, array)
+
+    reversed_copy = process.reverse_array(array, copy=True)
+    assert np.all(reversed_copy == array[:, ::-1, :])
+    assert reversed_copy.flags.c_contiguous
+    assert not np.shares_memory(reversed_copy, array)
+
+    chan_freq = np.linspace(230.0e9, 230.3e9, num=4)
+    assert process.isdecreasing(process.reverse_array(chan_freq, channel_axis=0, copy=True))
+
+
+def test_get_crosscorrelation_mask():
+    ant1 = np.array([0, 0, 1, 1, 2, 2])
+    ant2 = np.array([0, 1, 1, 2, 2, 0])
+
+    mask = process.get_crosscorrelation_mask(ant1, ant2)
+
+    assert mask.dtype == bool
+    assert np.all(mask == np.array([False, True, False, True, False, True]))
+    assert process.contains_autocorrelations(ant1, ant2)
+    assert not process.contains_autocorrelations(ant1[mask], ant2[mask])
+
+
+@pytest.fixture
+def fake_query(rng, monkeypatch):
+    # ``get_processed_visibilities`` reads from a measurement set through ``get_channels`` and
+    # ``query_datadescid``, so stand in for them with a small in-memory dataset
+    nchan, nvis = 4, 9
+    query = {
+        "data": rng.normal(size=(2, nchan, nvis))
+        + 1.0j * rng.normal(size=(2, nchan, nvis)),
+        "model_data": rng.normal(size=(2, nchan, nvis))
+        + 1.0j * rng.normal(size=(2, nchan, nvis)),
+        "flag": rng.random((2, nchan, nvis)) > 0.8,
+        "weight": rng.random((2, nvis)).astype(np.float32),
+        "uvw": rng.normal(size=(3, nvis)) * 1e3,
+        "antenna1": np.array([0, 0, 0, 1, 1, 2, 2, 3, 3]),
+        "antenna2": np.array([0, 1, 2, 1, 3, 3, 2, 0, 3]),
+    }
+    # stored in increasing frequency order, so the channels need to be reversed
+    chan_freq = np.linspace(230.0e9, 230.3e9, num=nchan)
+
+    monkeypatch.setattr(
+        process, "get_channels", lambda filename, datadescid: chan_freq, raising=False
+    )
+    monkeypatch.setattr(
+        process, "query_datadescid", lambda filename, datadescid: query, raising=False
+    )
+
+    return chan_freq, query
+
+
+def test_get_channel_sorted_data(fake_query):
+    chan_freq, query = fake_query
+
+    sorted_freq, data, model_data, flag = process.get_channel_sorted_data(
+        "fake.ms", 0, query=query
+    )
+
+    assert np.all(sorted_freq == chan_freq[::-1])
+    assert data.dtype == np.complex64
+    assert data.flags.c_contiguous
+    assert np.allclose(data, query["data"][:, ::-1, :])
+    assert np.allclose(model_data, query["model_data"][:, ::-1, :])
+    assert np.all(flag == query["flag"][:, ::-1, :])
+    # flag is only read once downstream, so it stays a view
+    assert np.shares_memory(flag, query["flag"])
+
+
+def expected_processed_visibilities(chan_freq, query, sigma_rescale):
+    # straightforward reference implementation of ``get_processed_visibilities``
+    xc = query["antenna1"] != query["antenna2"]
+
+    data = query["data"][:, ::-1, xc]
+    model_data = query["model_data"][:, ::-1, xc]
+    flag = query["flag"][:, ::-1, xc]
+    weight = query["weight"][:, np.newaxis, xc].astype(np.float64) * np.ones(
+        (len(chan_freq), 1)
+    )
+
+    wavelengths = c.value / chan_freq[::-1, np.newaxis]
+    u, v, w = query["uvw"][:, xc]
+
+    return {
+        "frequencies": chan_freq[::-1],
+        "uu": 1e-3 * u / wavelengths,
+        "vv": 1e-3 * v / wavelengths,
+        "data": np.conj(np.sum(data * weight, axis=0) / np.sum(weight, axis=0)),
+        "model_data": np.conj(
+            np.sum(model_data * weight, axis=0) / np.sum(weight, axis=0)
+        ),
+        "flag": np.any(flag, axis=0),
+        "weight": np.sum(weight, axis=0) / sigma_rescale ** 2,
+    }
+
+
+def test_get_processed_visibilities(fake_query):
+    chan_freq, query = fake_query
+
+    result = process.get_processed_visibilities("fake.ms", 0, sigma_rescale=2.0)
+    expected = expected_processed_visibilities(chan_freq, query, 2.0)
+
+    assert result["data"].dtype == np.complex64
+    assert result["weight"].dtype == np.float32
+    assert np.all(result["flag"] == expected["flag"])
+    for key in ["frequencies", "uu", "vv", "data", "model_data", "weight"]:
+        assert result[key].shape == expected[key].shape
+        assert np.allclose(result[key], expected[key], rtol=1e-5), key
+
+
+def test_get_processed_visibilities_dtype(fake_query):
+    chan_freq, query = fake_query
+
+    result = process.get_processed_visibilities("fake.ms", 0, dtype=None)
+    expected = expected_processed_visibilities(chan_freq, query, 1.0)
+
+    assert result["data"].dtype == np.complex128
+    assert np.allclose(result["data"], expected["data"])
+
+    # a NumPy float64 sigma_rescale shouldn't promote the single precision weights
+    result = process.get_processed_visibilities(
+        "fake.ms", 0, sigma_rescale=np.float64(2.0)
+    )
+    expected = expected_processed_visibilities(chan_freq, query, 2.0)
+
+    assert result["data"].dtype == np.complex64
+    assert result["weight"].dtype == np.float32
+    assert np.allclose(result["weight"], expected["weight"])
+
+
+def test_get_processed_visibilities_buffers(fake_query):
+    chan_freq, query = fake_query
+    nchan = len(chan_freq)
+    nxc = np.count_nonzero(query["antenna1"] != query["antenna2"])
+
+    buffers = {
+        "uvw": np.empty((3, nxc)),
+        "weight": np.empty((2, nxc), dtype=np.float32),
+        "data": np.empty((2, nchan, nxc), dtype=np.complex64),
+        "model_data": np.empty((2, nchan, nxc), dtype=np.complex64),
+        "flag": np.empty((2, nchan, nxc), dtype=bool),
+        "uv": np.empty((2, nchan, nxc)),
+        "data_avg": np.empty((nchan, nxc), dtype=np.complex64),
+        "model_data_avg": np.empty((nchan, nxc), dtype=np.complex64),
+        "flag_avg": np.empty((nchan, nxc), dtype=bool),
+        "weight_avg": np.empty(nxc, dtype=np.float32),
+    }
+
+    expected = process.get_processed_visibilities("fake.ms", 0, sigma_rescale=2.0)
+
+    # repeated calls reusing the same buffers should give the same results
+    for i in range(2):
+        result = process.get_processed_visibilities(
+            "fake.ms", 0, sigma_rescale=2.0, buffers=buffers
+        )
+
+        assert np.shares_memory(result["uu"], buffers["uv"])
+        assert np.shares_memory(result["vv"], buffers["uv"])
+        assert result["data"] is buffers["data_avg"]
+        assert result["model_data"] is buffers["model_data_avg"]
+        assert result["flag"] is buffers["flag_avg"]
+        assert np.shares_memory(result["weight"], buffers["weight_avg"])
+        for key in expected.keys():
+            assert np.all(result[key] == expected[key]), key
+
+
+@pytest.mark.parametrize(
+    "key, buffer",
+    [
+        ("data", np.empty((2, 4, 5), dtype=np.complex128)),
+        ("data", np.empty((2, 4, 9), dtype=np.complex64)),
+        ("flag", np.empty((2, 4, 5), dtype=np.uint8)),
+        ("uv", np.empty((2, 4, 5), dtype=np.float32)),
+        ("uv", np.empty((2, 5))),
+        ("data_avg", np.empty((4, 5), dtype=np.complex128)),
+        ("flag_avg", np.empty((2, 4, 5), dtype=bool)),
+        ("weight_avg", np.empty((4, 5), dtype=np.float32)),
+    ],
+)
+def test_get_processed_visibilities_bad_buffers(fake_query, key, buffer):
+    with pytest.raises(ValueError, match=key):
+        process.get_processed_visibilities("fake.ms", 0, buffers={key: buffer})